@@ -1,13 +1,167 @@
 import os
 import json
+import gzip
+import hashlib
+import math
 import numpy as np
+import torch
 from PIL import Image
 from PIL.PngImagePlugin import PngInfo
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import io
-import random
+import itertools
+import struct
+import zlib
+import queue
+import threading
+import atexit
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import folder_paths
 import configparser
+import functools
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from imagecodecs import spng_encode
+except ImportError:
+    spng_encode = None
+
+# PIL image modes for the channel counts of ComfyUI IMAGE tensors
+IMAGE_MODES = {1: 'L', 3: 'RGB', 4: 'RGBA'}
+
+# Discord rejects requests over 25MB; keep some headroom for the multipart encoding
+DISCORD_BATCH_LIMIT_MB = 24.5
+# Maximum number of attachments Discord accepts in one webhook message
+DISCORD_MAX_ATTACHMENTS = 10
+
+# Numbers the filename suffix of each node instance in this process
+_PREFIX_COUNTER = itertools.count()
+
+# Background uploads of all node instances, run by a single worker thread started on first use
+_upload_queue = None
+_upload_queue_lock = threading.Lock()
+
+
+def _dumps(obj):
+    """
+    Serializes an object to a JSON string, using orjson when it is installed.
+    
+    The result is always ASCII, like `json.dumps`, so it can be stored in PNG tEXt chunks.
+    
+    Args:
+        obj: The object to serialize.
+        
+    Returns:
+        str: The JSON string.
+    """
+    if orjson is not None:
+        try:
+            text = orjson.dumps(obj).decode()
+            if text.isascii():
+                return text
+        except TypeError:
+            pass
+    return json.dumps(obj)
+
+
+def _json_bytes(obj, indent=False):
+    """
+    Serializes an object to UTF-8 encoded JSON, using orjson when it is installed.
+    
+    Args:
+        obj: The object to serialize.
+        indent (bool): Whether to pretty-print with a two-space indent.
+        
+    Returns:
+        bytes: The encoded JSON.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def _upload_worker(tasks):
+    """
+    Runs queued uploads one at a time, in the order they were queued.
+    
+    Args:
+        tasks (queue.Queue): (function, arguments) tuples to call.
+    """
+    while True:
+        func, args = tasks.get()
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"Error in background upload: {e}")
+        finally:
+            tasks.task_done()
+
+
+def _get_upload_queue():
+    """
+    Returns the queue shared by all node instances for background uploads.
+    
+    The worker thread is started on the first call, and pending uploads are
+    waited for when the process exits.
+    
+    Returns:
+        queue.Queue: The upload queue.
+    """
+    global _upload_queue
+    with _upload_queue_lock:
+        if _upload_queue is None:
+            _upload_queue = queue.Queue()
+            threading.Thread(target=_upload_worker, args=(_upload_queue,), daemon=True).start()
+            atexit.register(_upload_queue.join)
+    return _upload_queue
+
+
+def _image_from_array(arr):
+    """
+    Wraps a uint8 image array in a PIL image; L and RGBA data is mapped without a copy.
+    
+    Args:
+        arr (numpy.ndarray): The image as uint8 in [height, width, channels] layout.
+        
+    Returns:
+        PIL.Image.Image: The image.
+    """
+    mode = IMAGE_MODES[arr.shape[2]]
+    return Image.frombuffer(mode, (arr.shape[1], arr.shape[0]), arr, 'raw', mode, 0, 1)
+
+
+def _insert_png_chunks(png, chunks):
+    """
+    Inserts ancillary chunks into an encoded PNG, right after its IHDR chunk.
+    
+    Args:
+        png (bytes): The encoded PNG.
+        chunks (list): (chunk type, data, ...) tuples, as collected by `PngInfo.chunks`.
+        
+    Returns:
+        bytes: The PNG with the chunks added.
+    """
+    if not chunks:
+        return png
+    # The 8-byte signature is followed by IHDR: length, type, 13 bytes of data and the CRC
+    header_end = 8 + 4 + 4 + 13 + 4
+    extra = b''.join(
+        struct.pack('>I', len(data)) + cid + data + struct.pack('>I', zlib.crc32(cid + data))
+        for cid, data, *_ in chunks
+    )
+    return png[:header_end] + extra + png[header_end:]
+
 
 class PreviewImageWithDiscord:
     """
@@ -16,11 +170,16 @@ class PreviewImageWithDiscord:
     Attributes:
         output_dir (str): The directory where temporary images are stored.
         type (str): The type of the generated images, default is 'temp'.
-        prefix_append (str): A random string appended to image filenames for uniqueness.
-        compress_level (int): Compression level for saving images.
+        prefix_append (str): A per-instance suffix for image filenames, unique within the process.
+        compress_level (int): Default PNG compression level for images sent to Discord.
         webhook_url (str): URL for Discord webhook to send the image.
         batch_size (int): Number of images to accumulate before sending a batch to Discord.
+        preview_max_size (int): Longest side of the UI-only preview used with a passthrough image.
+        encode_workers (int): Maximum number of images encoded in parallel.
+        fallback_workers (int): Number of concurrent uploads used by the batch fallback.
         image_queue (list): A list to hold paths of images waiting to be sent to Discord.
+        _scratch (torch.Tensor): uint8 conversion buffer kept between runs, or None.
+        session (requests.Session): HTTP session reused for every upload.
     """
 
     def __init__(self):
@@ -29,86 +188,352 @@ class PreviewImageWithDiscord:
         
         - Sets the output directory for temporary images using `folder_paths.get_temp_directory()`.
         - Defines a prefix to be appended to image filenames for uniqueness.
-        - Loads the webhook URL and configuration from a configuration file.
+        - Loads the webhook URL and configuration from the cached configuration file settings.
         """
         self.output_dir = folder_paths.get_temp_directory() # Ensure this is thread-safe if used in a multithreaded environment
         self.type = "temp"
-        self.prefix_append = "_temp_" + ''.join(random.choice("abcdefghijklmnopqrstupvxyz") for x in range(5))
+        self.prefix_append = f"_temp_{next(_PREFIX_COUNTER):05x}"
         self.compress_level = 1
         self.config = self.load_config()
-        self.webhook_url = self.config.get('Discord', 'webhook_url', fallback='')
+        self.webhook_url = self.config['webhook_url']
+        self.upload_format = self.config['upload_format']
+        self.strip_metadata = self.config['strip_metadata']
         self.batch_size = 5  # Number of images to accumulate before sending
+        self.preview_max_size = 512  # Longest side of the UI-only preview shown when passthrough is used
+        self.encode_workers = max(1, (os.cpu_count() or 2) // 2)  # Images encoded in parallel; Pillow releases the GIL while encoding
+        self.fallback_workers = 4  # Concurrent uploads when a batch falls back to individual sends
         self.image_queue = []
+        self._queue_mb = 0.0  # Total upload size of the queued images
+        self._queue_files = 0  # Attachments the queued images take, workflow JSON files included
+        self._scratch = None  # One conversion buffer, reused by the next run when the image shape matches
+        self.session = self._create_session()  # Keeps connections to Discord alive between uploads
+        # Uploads run on a background thread so the workflow continues while they are in flight
+        self._upload_q = _get_upload_queue()
         self.last_status = "Ready"  # Last send status
         
         # Fallback and compression configurations
-        self.enable_fallback = self.config.getboolean('Fallback', 'enable_fallback', fallback=True)
-        self.enable_compression = self.config.getboolean('Fallback', 'enable_compression', fallback=True)
-        self.compression_quality = self.config.getint('Fallback', 'compression_quality', fallback=80)
-        self.max_file_size_mb = self.config.getfloat('Fallback', 'max_file_size_mb', fallback=8.0)
+        self.enable_fallback = self.config['enable_fallback']
+        self.enable_compression = self.config['enable_compression']
+        self.compression_quality = self.config['compression_quality']
+        self.max_file_size_mb = self.config['max_file_size_mb']
+        self.compress_workflow = self.config['compress_workflow']
+        self.log_workflow = self.config['log_workflow']
 
-    def load_config(self):
+    def _create_session(self):
         """
-        Loads the complete configuration from a configuration file.
+        Creates the HTTP session used for all uploads.
+        
+        Connections are pooled and kept alive. Uploads that fail to connect or hit Discord's
+        rate limit are retried with backoff, honoring Retry-After. Other failures are not
+        retried, since Discord may already have posted the message.
         
         Returns:
-            ConfigParser: The configuration object with all settings loaded.
+            requests.Session: The configured session.
+        """
+        retry = Retry(
+            total=3,
+            read=0,  # A POST that timed out may still have been delivered
+            backoff_factor=0.3,
+            status_forcelist=[429],
+            allowed_methods=frozenset({'POST'}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """
+        Waits for pending background uploads and releases the pooled connections.
+        
+        The upload queue is shared, so this also waits for uploads of other instances.
+        """
+        self._upload_q.join()
+        self.session.close()
+
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def load_config(cls):
+        """
+        Loads the settings used by the node from the configuration file.
+        
+        The file is read and parsed once per process; call `reload_config()` to pick up
+        changes on the next node instantiation.
+        
+        Returns:
+            MappingProxyType: Read-only mapping of setting names to their parsed values.
         """
         config = configparser.ConfigParser()
         config_path = os.path.join(os.path.dirname(__file__), 'config.ini')
         config.read(config_path)
-        return config
+        return MappingProxyType({
+            'webhook_url': config.get('Discord', 'webhook_url', fallback=''),
+            'upload_format': config.get('Discord', 'upload_format', fallback='png').strip().lower(),
+            'strip_metadata': config.getboolean('Discord', 'strip_metadata', fallback=False),
+            'enable_fallback': config.getboolean('Fallback', 'enable_fallback', fallback=True),
+            'enable_compression': config.getboolean('Fallback', 'enable_compression', fallback=True),
+            'compression_quality': config.getint('Fallback', 'compression_quality', fallback=80),
+            'max_file_size_mb': config.getfloat('Fallback', 'max_file_size_mb', fallback=8.0),
+            'compress_workflow': config.getboolean('Fallback', 'compress_workflow', fallback=False),
+            'log_workflow': config.getboolean('Debug', 'log_workflow', fallback=False),
+        })
 
-    def get_file_size_mb(self, file_path):
+    @classmethod
+    def reload_config(cls):
         """
-        Gets the size of a file in megabytes.
+        Discards the cached settings so the configuration file is read again on the next load.
         
-        Args:
-            file_path (str): Path to the file.
-            
         Returns:
-            float: File size in MB.
+            MappingProxyType: The freshly loaded settings.
         """
-        return os.path.getsize(file_path) / (1024 * 1024)
-    
-    def compress_image(self, image_path):
+        cls.load_config.cache_clear()
+        return cls.load_config()
+
+    def compress_image(self, img, webp_size_mb=None):
         """
-        Compresses an image to WebP format to reduce file size.
+        Compresses an in-memory image to WebP format to reduce file size.
+        
+        The image is encoded from the PIL object that was just saved, so the
+        original file is never read back and decoded.
         
         Args:
-            image_path (str): Path to the original image file.
+            img (PIL.Image.Image): The image to compress.
+            webp_size_mb (float, optional): Size of a WebP encode of `img` at the configured quality
+                that is already over the limit; the quality pass is skipped and the image is only downscaled.
             
         Returns:
-            str: Path to the compressed file.
+            memoryview: The WebP encoded image.
             
         Raises:
             Exception: If there's an error during compression.
         """
-        print("⚠️ Warning: Compressing to WebP will remove workflow metadata from PNG")
+        if webp_size_mb is None:
+            print("⚠️ Warning: Compressing to WebP will remove workflow metadata from PNG")
         
         try:
-            with Image.open(image_path) as img:
-                # Convert to appropriate mode for WebP
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    if img.mode == 'P' and 'transparency' in img.info:
-                        img = img.convert('RGBA')
-                    elif img.mode == 'LA':
-                        img = img.convert('RGBA')
-                else:
-                    img = img.convert('RGB')
-                
-                # Generate compressed filename
-                base_name = os.path.splitext(os.path.basename(image_path))[0]
-                compressed_path = os.path.join(os.path.dirname(image_path), f"{base_name}_compressed.webp")
-                
-                # Save with WebP compression
-                img.save(compressed_path, 'WEBP', quality=self.compression_quality, optimize=True)
-                
-                return compressed_path
+            # Convert to appropriate mode for WebP
+            if img.mode in ('RGBA', 'LA', 'P'):
+                if img.mode == 'P' and 'transparency' in img.info:
+                    img = img.convert('RGBA')
+                elif img.mode == 'LA':
+                    img = img.convert('RGBA')
+            else:
+                img = img.convert('RGB')
+            
+            # Save with lossy WebP compression. method is pinned explicitly: method 4 is the
+            # libwebp default speed/size balance, while a lossless encode at high effort can
+            # take tens of times longer for a few percent smaller files (use method 0-3 there).
+            if webp_size_mb is None:
+                buffer = io.BytesIO()
+                img.save(buffer, 'WEBP', quality=self.compression_quality, method=4, lossless=False)
+                size_mb = buffer.tell() / (1024 * 1024)
+            else:
+                size_mb = webp_size_mb
+            
+            # Quality alone may not be enough for very large images, so shrink them to fit the limit.
+            # File size grows roughly with pixel count: scale each side by the square root of the ratio.
+            if size_mb > self.max_file_size_mb:
+                scale = math.sqrt(self.max_file_size_mb / size_mb) * 0.9
+                new_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+                print(f"⚠️ Still {size_mb:.1f}MB after compression, resizing to {new_size[0]}x{new_size[1]}")
+                img = img.resize(new_size, Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                img.save(buffer, 'WEBP', quality=self.compression_quality, method=4, lossless=False)
+            
+            return buffer.getbuffer()
                 
         except Exception as e:
             raise Exception(f"Error compressing image: {e}")
     
+    def _downscale_for_preview(self, images):
+        """
+        Shrinks images so their longest side fits `preview_max_size`, on the device they live on.
+        
+        Args:
+            images (torch.Tensor): Images in ComfyUI's [batch, height, width, channels] layout.
+            
+        Returns:
+            torch.Tensor: The resized images, or `images` unchanged if they are already small enough.
+        """
+        height, width = images.shape[1:3]
+        scale = self.preview_max_size / max(height, width)
+        if scale >= 1:
+            return images
+        size = (max(1, round(height * scale)), max(1, round(width * scale)))
+        resized = torch.nn.functional.interpolate(images.movedim(-1, 1), size=size, mode='bilinear', antialias=True)
+        return resized.movedim(1, -1).contiguous()
+    
+    def _scratch_buffers(self, shape, count, pin_memory=False):
+        """
+        Returns uint8 host buffers for image conversion.
+        
+        One regular buffer is kept between runs and reused while the image shape stays the same;
+        the others, and all page-locked buffers, are allocated per run and freed once it ends.
+        
+        Args:
+            shape (torch.Size): Shape of a single image.
+            count (int): Number of buffers needed.
+            pin_memory (bool): Whether the buffers must be page-locked for asynchronous GPU copies.
+            
+        Returns:
+            list: `count` uint8 tensors of the requested shape.
+        """
+        if pin_memory:
+            # Page-locked memory can't be swapped out, so it is never held past the current run
+            return [torch.empty(shape, dtype=torch.uint8, pin_memory=True) for _ in range(count)]
+        if self._scratch is None or self._scratch.shape != shape:
+            self._scratch = torch.empty(shape, dtype=torch.uint8)
+        return [self._scratch] + [torch.empty(shape, dtype=torch.uint8) for _ in range(count - 1)]
+    
+    def _iter_uint8(self, images, buffers=1):
+        """
+        Converts images to uint8 host arrays one at a time, cycling through a fixed set of buffers.
+        
+        For CUDA tensors the conversion and device-to-host copy of the next image are queued on a
+        separate stream into an extra pinned buffer, so they overlap the encoding of the current one.
+        
+        Args:
+            images (torch.Tensor): Images in ComfyUI's [batch, height, width, channels] layout, in 0-1 range.
+            buffers (int): Number of yielded arrays that must stay valid at the same time.
+            
+        Yields:
+            numpy.ndarray: The next image as uint8; its buffer is reused once `buffers` more arrays are requested.
+        """
+        if not images.is_cuda:
+            scaled = torch.empty_like(images[0])
+            scratch = self._scratch_buffers(images[0].shape, buffers)
+            for index, image in enumerate(images):
+                # Scale and clamp in place, then cast while copying into the host buffer
+                torch.mul(image, 255, out=scaled).clamp_(0, 255)
+                scratch[index % buffers].copy_(scaled)
+                yield scratch[index % buffers].numpy()
+            return
+        
+        slots = buffers + 1
+        copy_stream = torch.cuda.Stream(device=images.device)
+        pinned = self._scratch_buffers(images[0].shape, slots, pin_memory=True)
+        copied = [torch.cuda.Event() for _ in range(slots)]
+        
+        def start_copy(index):
+            with torch.cuda.stream(copy_stream):
+                converted = images[index].mul(255).clamp_(0, 255).to(torch.uint8)
+                pinned[index % slots].copy_(converted, non_blocking=True)
+                copied[index % slots].record(copy_stream)
+        
+        # The images may still be being written by the producing stream
+        copy_stream.wait_stream(torch.cuda.current_stream(images.device))
+        start_copy(0)
+        for index in range(len(images)):
+            # The next slot was released by the caller when it asked for this image
+            if index + 1 < len(images):
+                start_copy(index + 1)
+            copied[index % slots].synchronize()
+            yield pinned[index % slots].numpy()
+    
+    def _encode_image(self, arr, full_path, metadata, webp, send, compress_level):
+        """
+        Saves one image and, when it is going to be uploaded, compresses it if it is too large.
+        
+        The image is encoded once into memory; the same bytes are written to the preview file
+        in a single write and uploaded without reading the file back. PNGs are encoded with
+        libspng when imagecodecs is installed, and with Pillow otherwise; the metadata is added
+        to the encoded PNG afterwards, and left out of the upload when `strip_metadata` is set.
+        Runs on the encoder thread pool; both encoders release the GIL while encoding.
+        
+        Args:
+            arr (numpy.ndarray): The image as uint8; must stay unchanged until this returns.
+            full_path (str): Path of the preview file to write.
+            metadata (PngInfo): Text chunks to embed when saving as PNG.
+            webp (bool): Whether to save as lossy WebP instead of PNG.
+            send (bool): Whether the image will be sent to Discord.
+            compress_level (int): PNG compression level.
+            
+        Returns:
+            tuple: The upload file name, its encoded bytes and its size in MB, or None when not sending.
+        """
+        # A fully opaque alpha channel carries no information; dropping it saves a quarter of the encode work
+        if arr.shape[2] == 4 and arr[..., 3].min() == 255:
+            arr = np.ascontiguousarray(arr[..., :3])
+        
+        img = None
+        if webp:
+            img = _image_from_array(arr)
+            buffer = io.BytesIO()
+            img.save(buffer, 'WEBP', quality=self.compression_quality, method=4)
+            data = upload = buffer.getbuffer()
+        else:
+            if spng_encode is not None:
+                png = spng_encode(arr, level=compress_level)
+            else:
+                img = _image_from_array(arr)
+                buffer = io.BytesIO()
+                img.save(buffer, 'PNG', compress_level=compress_level)
+                png = buffer.getvalue()
+            # The text chunks are spliced in after encoding, so the upload can leave them out
+            data = _insert_png_chunks(png, metadata.chunks)
+            upload = png if self.strip_metadata else data
+        with open(full_path, 'wb') as f:
+            f.write(data)
+        
+        if not send:
+            return None
+        
+        # Compress now, while the image is still in memory
+        file = os.path.basename(full_path)
+        data = upload
+        size_mb = len(data) / (1024 * 1024)
+        if self.enable_compression and size_mb > self.max_file_size_mb:
+            try:
+                if webp:
+                    # Already encoded at the configured quality, so only the downscale is left
+                    data = self.compress_image(img, webp_size_mb=size_mb)
+                else:
+                    data = self.compress_image(img if img is not None else _image_from_array(arr))
+                file = f"{os.path.splitext(file)[0]}.webp"
+                size_mb = len(data) / (1024 * 1024)
+                print(f"🗜️ {file} compressed to {size_mb:.1f}MB")
+            except Exception as e:
+                print(f"Error compressing {file}: {e}")
+        return file, data, size_mb
+    
+    def _dispatch_encoded(self, future, workflow_bytes, send, batch_mode):
+        """
+        Waits for an image encode to finish and hands the result to the batch queue or the uploader.
+        
+        Args:
+            future (Future): The pending `_encode_image` call.
+            workflow_bytes (bytes): Serialized workflow JSON, or None.
+            send (bool): Whether the image is sent to Discord.
+            batch_mode (bool): Whether to queue the image for a batch send.
+        """
+        encoded = future.result()
+        if not send:
+            return
+        
+        filename, data, size_mb = encoded
+        if batch_mode:
+            # Workflow metadata only survives in PNG, so other formats carry it as its own attachment
+            if self._get_mime_type(filename) == 'image/png':
+                workflow_bytes = None
+            files = 1
+            if workflow_bytes:
+                files += 1
+                size_mb += len(workflow_bytes) / (1024 * 1024)
+            # Send what is queued first if this image would not fit in the same message
+            if self.image_queue and (self._queue_mb + size_mb > DISCORD_BATCH_LIMIT_MB
+                                     or self._queue_files + files > DISCORD_MAX_ATTACHMENTS):
+                self.send_batch_to_discord()
+            # Store the encoded image, workflow JSON and the upload size for batch processing
+            self.image_queue.append((filename, data, workflow_bytes, size_mb))
+            self._queue_mb += size_mb
+            self._queue_files += files
+            if len(self.image_queue) >= self.batch_size:
+                self.send_batch_to_discord()
+        else:
+            # Upload in the background so the next image can be encoded meanwhile
+            self._upload_q.put((self.send_to_discord, (filename, data, workflow_bytes)))
+    
     def _get_mime_type(self, file_path):
         """
         Determines MIME type based on file extension.
@@ -127,36 +552,22 @@ class PreviewImageWithDiscord:
         else:
             return 'image/png'
     
-    def _cleanup_temp_files(self, current_path, original_path, workflow_path):
-        """
-        Cleans up temporary files created during processing.
-        
-        Args:
-            current_path (str): Path to the current (possibly compressed) image.
-            original_path (str): Path to the original image.
-            workflow_path (str): Path to the workflow JSON file.
-        """
-        for path in [current_path, workflow_path]:
-             if path and path != original_path and os.path.exists(path):
-                 try:
-                     os.remove(path)
-                 except OSError:
-                     pass
-
     @classmethod
     def INPUT_TYPES(s):
         """
         Defines the input types for the node.
         
         Returns:
-            dict: A dictionary specifying required and hidden inputs.
+            dict: A dictionary specifying required, optional and hidden inputs.
         """
         return {"required":
                     {"images": ("IMAGE", ),
                      "send_to_discord": ("BOOLEAN", {"default": False}),
                      "batch_mode": ("BOOLEAN", {"default": False})},
                 "optional":
-                    {"passthrough_image": ("IMAGE", )},
+                    {"passthrough_image": ("IMAGE", ),
+                     "compress_level": ("INT", {"default": 1, "min": 0, "max": 9,
+                                                "tooltip": "PNG compression for images sent to Discord. Local-only previews are stored uncompressed. Ignored when upload_format is webp."})},
                 "hidden": {"prompt": "PROMPT", "extra_pnginfo": "EXTRA_PNGINFO"},
                 }
 
@@ -166,7 +577,7 @@ class PreviewImageWithDiscord:
     OUTPUT_NODE = True
     CATEGORY = "image"
 
-    def preview_images(self, images, send_to_discord=False, batch_mode=False, passthrough_image=None, prompt=None, extra_pnginfo=None):
+    def preview_images(self, images, send_to_discord=False, batch_mode=False, passthrough_image=None, prompt=None, extra_pnginfo=None, compress_level=None):
         """
         Previews images and optionally sends them to Discord.
         
@@ -177,62 +588,88 @@ class PreviewImageWithDiscord:
             passthrough_image (list, optional): Optional image input for passthrough.
             prompt (str, optional): Prompt text to add as metadata.
             extra_pnginfo (dict, optional): Additional PNG info to add as metadata.
+            compress_level (int, optional): PNG compression level for images sent to Discord.
         
         Returns:
             dict: A dictionary containing the UI results with image details and optional image output.
         """
-        full_output_folder, filename, counter, subfolder, filename_prefix = folder_paths.get_save_image_path("ComfyUI", self.output_dir, images[0].shape[1], images[0].shape[0])
+        previews = images
+        if passthrough_image is not None and not send_to_discord:
+            # The images only feed the UI here, so preview the first one, shrunk before it leaves its device
+            previews = self._downscale_for_preview(images[:1])
+        
+        full_output_folder, filename, counter, subfolder, filename_prefix = folder_paths.get_save_image_path("ComfyUI", self.output_dir, previews[0].shape[1], previews[0].shape[0])
         results = list()
-        for image in images:
-            i = 255. * image.cpu().numpy()
-            img = Image.fromarray(np.clip(i, 0, 255).astype(np.uint8))
-            
-            metadata = PngInfo()
-            if prompt is not None:
-                metadata.add_text("prompt", json.dumps(prompt))
-            if extra_pnginfo is not None:
-                for x in extra_pnginfo:
-                    metadata.add_text(x, json.dumps(extra_pnginfo[x]))
-
-            file = f"{filename}_{counter:05}_.png"
-            full_path = os.path.join(full_output_folder, file)
-            img.save(full_path, pnginfo=metadata, compress_level=self.compress_level)
-            
-            results.append({
-                "filename": file,
-                "subfolder": subfolder,
-                "type": self.type
-            })
-
-            # Send image to Discord if enabled
-            if send_to_discord and self.webhook_url:
-                # Extract workflow JSON if available
-                workflow_json = None
-                if extra_pnginfo and 'workflow' in extra_pnginfo:
-                    workflow_json = extra_pnginfo['workflow']
-                
-                if batch_mode:
-                    # Store both image path and workflow JSON for batch processing
-                    self.image_queue.append((full_path, file, workflow_json))
-                    if len(self.image_queue) >= self.batch_size:
-                        self.send_batch_to_discord()
+        # prompt and extra_pnginfo are the same for every image, so the metadata is built once per batch
+        metadata = PngInfo()
+        if prompt is not None:
+            metadata.add_text("prompt", _dumps(prompt))
+        if extra_pnginfo is not None:
+            for x in extra_pnginfo:
+                metadata.add_text(x, _dumps(extra_pnginfo[x]))
+        
+        # Serialize the workflow once; it is attached to uploads that can't carry PNG metadata
+        workflow_bytes = None
+        if send_to_discord and extra_pnginfo and 'workflow' in extra_pnginfo:
+            workflow_bytes = _json_bytes(extra_pnginfo['workflow'])
+            if self.compress_workflow:
+                workflow_bytes = gzip.compress(workflow_bytes, compresslevel=6)
+        
+        send = send_to_discord and self.webhook_url
+        # Encode straight to WebP for upload; the workflow is sent alongside since WebP drops PNG metadata
+        webp = send and self.upload_format == 'webp'
+        extension = 'webp' if webp else 'png'
+        # File names only differ by counter, so build them from templates formatted per image
+        name_tmpl = f"{filename}_{{:05}}_.{extension}"
+        path_tmpl = os.path.join(full_output_folder.replace('{', '{{').replace('}', '}}'), name_tmpl)
+        # Previews that never leave this machine skip deflate entirely
+        if not send:
+            compress_level = 0
+        elif compress_level is None:
+            compress_level = self.compress_level
+        
+        # Results of already saved images keyed by a hash of their pixels, to skip identical images
+        seen = {}
+        # Encodes in flight as (index, future), oldest first
+        pending = deque()
+        workers = min(len(previews), self.encode_workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each array is a reused conversion buffer; every image in a batch shares the same shape
+            for index, arr in enumerate(self._iter_uint8(previews, buffers=workers + 1)):
+                # Identical images (e.g. repeated seeds) are shown again but not encoded or uploaded twice
+                digest = hashlib.blake2b(arr, digest_size=8).digest()
+                if digest in seen:
+                    results.append(seen[digest])
                 else:
-                    self.send_to_discord(full_path, file, workflow_json)
-
-            counter += 1
+                    file = name_tmpl.format(counter)
+                    full_path = path_tmpl.format(counter)
+                    seen[digest] = {
+                        "filename": file,
+                        "subfolder": subfolder,
+                        "type": self.type
+                    }
+                    results.append(seen[digest])
+                    future = executor.submit(self._encode_image, arr, full_path, metadata, webp, send, compress_level)
+                    pending.append((index, future))
+                    counter += 1
+                
+                # A buffer is refilled once `workers` more images are requested, so wait for the encodes using it
+                while pending and pending[0][0] <= index - workers:
+                    self._dispatch_encoded(pending.popleft()[1], workflow_bytes, send, batch_mode)
+            
+            while pending:
+                self._dispatch_encoded(pending.popleft()[1], workflow_bytes, send, batch_mode)
 
         # Send any remaining images in the queue
         if send_to_discord and batch_mode and self.image_queue:
             self.send_batch_to_discord()
 
-        # Log workflow JSON if available (useful for debugging and potential future features)
-        if extra_pnginfo and 'workflow' in extra_pnginfo:
-            print(f"📋 Workflow JSON detected: {len(str(extra_pnginfo['workflow']))} characters")
-            # Optionally log the workflow to a file for analysis
+        # Log workflow JSON to a file for debugging, only when enabled in the configuration
+        if self.log_workflow and extra_pnginfo and 'workflow' in extra_pnginfo:
             try:
                 workflow_log_path = os.path.join(self.output_dir, "workflow_log.json")
-                with open(workflow_log_path, 'w') as f:
-                    json.dump(extra_pnginfo['workflow'], f, indent=2)
+                with open(workflow_log_path, 'wb') as f:
+                    f.write(_json_bytes(extra_pnginfo['workflow'], indent=True))
                 print(f"📁 Workflow saved to: {workflow_log_path}")
             except Exception as e:
                 print(f"⚠️ Could not save workflow: {e}")
@@ -241,46 +678,27 @@ class PreviewImageWithDiscord:
         output_image = passthrough_image if passthrough_image is not None else images
         return {"ui": {"images": results}, "result": (output_image,)}
 
-    def send_to_discord(self, image_path, filename, workflow_json=None):
+    def send_to_discord(self, filename, data, workflow_bytes=None):
         """
-        Sends a single image to Discord with intelligent fallback and compression.
+        Sends a single image to Discord, with its workflow JSON when the upload is not a PNG.
         
         Args:
-            image_path (str): The path to the image file.
-            filename (str): The name of the image file.
-            workflow_json (dict, optional): Workflow JSON to send alongside compressed images.
+            filename (str): The name of the image file; its extension determines the MIME type.
+            data (bytes): The encoded image.
+            workflow_bytes (bytes, optional): Serialized workflow JSON to send alongside non-PNG images.
         """
         self.last_status = "📤 Sending..."
-        current_path = image_path
         attempts = []
-        workflow_path = None
         
-        # Check if compression is needed
-        if self.enable_compression and self.get_file_size_mb(current_path) > self.max_file_size_mb:
-            try:
-                current_path = self.compress_image(current_path)
-                attempts.append(f"Compressed to {self.get_file_size_mb(current_path):.1f}MB")
-                
-                # Create workflow JSON file if available
-                if workflow_json:
-                    base_name = os.path.splitext(filename)[0]
-                    workflow_filename = f"{base_name}_workflow.json"
-                    workflow_path = os.path.join(os.path.dirname(current_path), workflow_filename)
-                    
-                    try:
-                        with open(workflow_path, 'w') as f:
-                            json.dump(workflow_json, f, indent=2)
-                        attempts.append("+ workflow JSON")
-                        print("📋 Workflow JSON will be sent alongside compressed image")
-                    except Exception as e:
-                        print(f"⚠️ Could not create workflow file: {e}")
-                        workflow_path = None
-                        
-            except Exception as e:
-                print(f"Error compressing image: {e}")
+        # Workflow metadata only survives in PNG, so send it alongside any other format
+        if workflow_bytes and self._get_mime_type(filename) != 'image/png':
+            attempts.append("+ workflow JSON")
+            print("📋 Workflow JSON will be sent alongside the image")
+        else:
+            workflow_bytes = None
         
         # Attempt sending
-        success = self._attempt_send_single(current_path, filename, workflow_path)
+        success = self._attempt_send_single(filename, data, workflow_bytes)
         
         if success:
             self.last_status = "✅ Sent"
@@ -291,39 +709,49 @@ class PreviewImageWithDiscord:
         else:
             self.last_status = "❌ Error"
             print(f"Error sending image: {filename}")
+    
+    def _workflow_attachment(self, filename, workflow_bytes):
+        """
+        Builds the multipart entry for the workflow JSON sent alongside an image.
         
-        # Clean up temporary files
-        self._cleanup_temp_files(current_path, image_path, workflow_path)
+        Args:
+            filename (str): Name of the image the workflow belongs to.
+            workflow_bytes (bytes): Serialized workflow JSON, gzipped if `compress_workflow` is set.
+            
+        Returns:
+            tuple: The file name, content and MIME type of the attachment.
+        """
+        workflow_filename = f"{os.path.splitext(filename)[0]}_workflow.json"
+        if self.compress_workflow:
+            return (f"{workflow_filename}.gz", workflow_bytes, 'application/gzip')
+        return (workflow_filename, workflow_bytes, 'application/json')
     
-    def _attempt_send_single(self, image_path, filename, workflow_path=None):
+    def _attempt_send_single(self, filename, data, workflow_bytes=None):
         """
         Attempts to send a single image to Discord, optionally with workflow JSON file.
         
         Args:
-            image_path (str): Path to the image file.
             filename (str): Name of the file.
-            workflow_path (str, optional): Path to the workflow JSON file.
+            data (bytes): The encoded image.
+            workflow_bytes (bytes, optional): Serialized workflow JSON, attached as a separate file.
             
         Returns:
             bool: True if sending was successful, False otherwise.
         """
         try:
             # Determine MIME type
-            mime_type = self._get_mime_type(image_path)
-            
-            files = {}
+            mime_type = self._get_mime_type(filename)
             
-            # Add image file
-            with open(image_path, 'rb') as img_file:
-                files['file'] = (filename, img_file.read(), mime_type)
+            # The image is uploaded straight from memory
+            files = {'file': (filename, data, mime_type)}
             
             # Add workflow JSON file if available
-            if workflow_path and os.path.exists(workflow_path):
-                with open(workflow_path, 'rb') as workflow_file:
-                    files['file1'] = (os.path.basename(workflow_path), workflow_file.read(), 'application/json')
+            if workflow_bytes:
+                files['file1'] = self._workflow_attachment(filename, workflow_bytes)
             
-            response = requests.post(self.webhook_url, files=files, timeout=30)
-            return response.status_code == 200
+            response = self.session.post(self.webhook_url, files=files, timeout=30)
+            # Discord answers 204 unless the webhook URL asks to wait for the created message
+            return response.status_code in (200, 204)
             
         except Exception as e:
             print(f"Error in individual send: {e}")
@@ -331,118 +759,89 @@ class PreviewImageWithDiscord:
 
     def send_batch_to_discord(self):
         """
-        Sends a batch of images to Discord with intelligent fallback.
+        Hands the queued images to the background uploader as one batch and empties the queue.
         """
         if not self.image_queue:
             return
-            
-        self.last_status = f"📤 Sending batch ({len(self.image_queue)} images)..."
+        
+        self._upload_q.put((self._send_batch, (self.image_queue,)))
+        self.image_queue = []
+        self._queue_mb = 0.0
+        self._queue_files = 0
+    
+    def _send_batch(self, batch):
+        """
+        Sends a batch of images to Discord as one message, with intelligent fallback.
+        
+        The queue is flushed before it outgrows a single message, so the batch is posted as is.
+        
+        Args:
+            batch (list): Queued image tuples to send.
+        """
+        total = len(batch)
+        self.last_status = f"📤 Sending batch ({total} images)..."
         
         # Try batch sending first
-        batch_success = self._attempt_send_batch()
-        
-        if batch_success:
-            self.last_status = f"✅ Batch sent ({len(self.image_queue)} images)"
-            print(f"Batch of {len(self.image_queue)} images sent successfully")
-        elif self.enable_fallback:
-            # Fallback: send one by one
-            self.last_status = "🔄 Fallback: sending individually..."
-            print("Fallback activated: sending images individually")
-            
-            success_count = 0
-            for image_data in self.image_queue:
-                image_path, filename, workflow_json = image_data
-                if self._attempt_send_single_for_batch(image_path, filename, workflow_json):
-                    success_count += 1
-            
-            if success_count == len(self.image_queue):
-                self.last_status = f"✅ Sent individually ({success_count}/{len(self.image_queue)})"
-            else:
-                self.last_status = f"⚠️ Partial ({success_count}/{len(self.image_queue)})"
-            
-            print(f"Fallback completed: {success_count}/{len(self.image_queue)} images sent")
-        else:
-            self.last_status = "❌ Batch error"
+        if self._attempt_send_batch(batch):
+            print(f"Batch of {total} images sent successfully")
+            self.last_status = f"✅ Batch sent ({total} images)"
+            return
+        
+        if not self.enable_fallback:
             print("Error sending batch and fallback disabled")
+            self.last_status = "❌ Batch error"
+            return
+        
+        # Fallback: send one by one
+        self.last_status = "🔄 Fallback: sending individually..."
+        print("Fallback activated: sending images individually")
+        
+        # A few uploads in flight hide connection latency while staying within Discord's rate limits
+        with ThreadPoolExecutor(max_workers=self.fallback_workers) as executor:
+            sent = sum(executor.map(lambda image_data: self._attempt_send_single(*image_data[:3]), batch))
         
-        self.image_queue.clear()
+        print(f"Fallback completed: {sent}/{total} images sent")
+        if sent == total:
+            self.last_status = f"✅ Sent individually ({sent}/{total})"
+        else:
+            self.last_status = f"⚠️ Partial ({sent}/{total})"
     
-    def _attempt_send_batch(self):
+    def _attempt_send_batch(self, batch):
         """
         Attempts to send a batch of images to Discord.
         
+        Args:
+            batch (list): Queued image tuples to send in a single message.
+            
         Returns:
             bool: True if sending was successful, False otherwise.
         """
         try:
             files = {}
-            total_size = 0
             
-            for i, image_data in enumerate(self.image_queue):
-                image_path, filename, workflow_json = image_data
-                file_size = self.get_file_size_mb(image_path)
-                total_size += file_size
+            # Check Discord limit; sizes, workflow JSON included, were recorded when the images were queued
+            total_size = sum(image_data[-1] for image_data in batch)
+            if total_size > DISCORD_BATCH_LIMIT_MB:
+                print(f"Batch exceeds {DISCORD_BATCH_LIMIT_MB}MB ({total_size:.1f}MB), activating fallback")
+                return False
+            
+            for image_data in batch:
+                filename, data, workflow_bytes, size_mb = image_data
                 
-                # Check Discord limit (25MB total)
-                if total_size > 25:
-                    print(f"Batch exceeds 25MB ({total_size:.1f}MB), activating fallback")
-                    return False
+                # Determine MIME type
+                mime_type = self._get_mime_type(filename)
+                files[f'file{len(files)}'] = (filename, data, mime_type)
                 
-                with open(image_path, 'rb') as img_file:
-                    # Determine MIME type
-                    mime_type = self._get_mime_type(image_path)
-                    files[f'file{i}'] = (filename, img_file.read(), mime_type)
+                # Images that lost their PNG metadata are followed by their workflow JSON
+                if workflow_bytes:
+                    files[f'file{len(files)}'] = self._workflow_attachment(filename, workflow_bytes)
             
-            response = requests.post(self.webhook_url, files=files, timeout=60)
-            return response.status_code == 200
+            response = self.session.post(self.webhook_url, files=files, timeout=60)
+            return response.status_code in (200, 204)
             
         except Exception as e:
             print(f"Error in batch send: {e}")
             return False
-    
-    def _attempt_send_single_for_batch(self, image_path, filename, workflow_json=None):
-        """
-        Attempts to send an individual image as part of batch fallback.
-        
-        Args:
-            image_path (str): Path to the image file.
-            filename (str): Name of the file.
-            workflow_json (dict, optional): Workflow JSON to send alongside compressed images.
-            
-        Returns:
-            bool: True if sending was successful, False otherwise.
-        """
-        current_path = image_path
-        workflow_path = None
-        
-        # Apply compression if enabled and necessary
-        if self.enable_compression and self.get_file_size_mb(current_path) > self.max_file_size_mb:
-            try:
-                current_path = self.compress_image(current_path)
-                
-                # If we compressed and have workflow JSON, create a temporary JSON file
-                if workflow_json:
-                    base_name = os.path.splitext(filename)[0]
-                    workflow_filename = f"{base_name}_workflow.json"
-                    workflow_path = os.path.join(os.path.dirname(current_path), workflow_filename)
-                    
-                    try:
-                        with open(workflow_path, 'w') as f:
-                            json.dump(workflow_json, f, indent=2)
-                    except Exception as e:
-                        print(f"⚠️ Could not create workflow file for batch fallback: {e}")
-                        workflow_path = None
-                        
-            except Exception as e:
-                print(f"Error compressing {filename}: {e}")
-        
-        # Attempt sending
-        success = self._attempt_send_single(current_path, filename, workflow_path)
-        
-        # Clean up temporary files
-        self._cleanup_temp_files(current_path, image_path, workflow_path)
-        
-        return success
 
 # Node class mappings
 NODE_CLASS_MAPPINGS = {